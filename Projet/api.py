@@ -1,16 +1,23 @@
 # api.py (Version 4.2 - Finale, Robuste et Nettoyée)
 
 # --- Importations des biblioothèques de base ---
+import asyncio
 import csv
-import io
+import codecs
+import hashlib
 import pandas as pd
 import numpy as np
 import plotly.express as px
+from plotly.offline import get_plotlyjs_version
 import json
 import uuid
 import os
+import multiprocessing
 import markdown
-from io import StringIO
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Literal, Union
 from fastapi import FastAPI, Request, File, UploadFile, Form, Depends, HTTPException
@@ -18,9 +25,10 @@ from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 # --- Importation des Outils Backend ---
-from packages.modules.loading import DataLoader
+from packages.modules.loading import DataLoader, MOTEUR_EXCEL, TAILLE_ECHANTILLON_CSV, detecter_separateur, lire_csv_pyarrow
 from packages.modules.netoyage import Netoyage
 from packages.modules.analysis import Analyse
 from packages.modules.numeric_data import Numeric_data
@@ -30,11 +38,51 @@ from packages.modules.methode_umap import MethodeUMAP
 from packages.modules.auto_selector import AutoSelector
 from packages.modules.clean_dataframe_for_json import CleanDataframeForJson
 from packages.modules.sauvegarde_bdd import SauvegardeBDD
+from packages.modules.standardisation import standardiser
+
+# --- Dimensionnement du calcul ---
+# Chaque worker gunicorn (WEB_CONCURRENCY, lu aussi par gunicorn) a son propre pool de processus :
+# les cœurs sont partagés entre workers, puis entre processus du pool (BLAS, Numba, n_jobs).
+# NB_PROCESSUS_CALCUL force la taille du pool de chaque worker.
+NB_COEURS = os.cpu_count() or 1
+NB_WORKERS_WEB = max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+NB_PROCESSUS_CALCUL = max(1, int(os.environ.get("NB_PROCESSUS_CALCUL", "0")) or NB_COEURS // NB_WORKERS_WEB)
+NB_THREADS_PAR_PROCESSUS = max(1, NB_COEURS // (NB_WORKERS_WEB * NB_PROCESSUS_CALCUL))
+
+def initialiser_processus_calcul(nb_threads: int):
+    """
+    Limite les threads d'un processus du pool : BLAS/OpenMP (threadpoolctl et variables
+    d'environnement pour les bibliothèques chargées plus tard), Numba (UMAP) et joblib (n_jobs=-1).
+    """
+    for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMBA_NUM_THREADS", "LOKY_MAX_CPU_COUNT"):
+        os.environ[variable] = str(nb_threads)
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(limits=nb_threads)
+    import numba
+    numba.set_num_threads(min(nb_threads, numba.config.NUMBA_NUM_THREADS))
+
+def creer_pool_calcul() -> ProcessPoolExecutor:
+    """Pool de processus des réductions, threads limités dans chaque processus."""
+    # 'spawn' évite de forker un processus qui a déjà des threads actifs (boucle asyncio, pyarrow)
+    return ProcessPoolExecutor(
+        max_workers=NB_PROCESSUS_CALCUL,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initialiser_processus_calcul,
+        initargs=(NB_THREADS_PAR_PROCESSUS,)
+    )
 
 # --- Configuration de l'Application ---
+@asynccontextmanager
+async def cycle_de_vie(app: FastAPI):
+    """Crée le pool de processus (réductions ACP/t-SNE/UMAP) au démarrage et le ferme à l'arrêt."""
+    app.state.pool = creer_pool_calcul()
+    yield
+    app.state.pool.shutdown()
+
 app = FastAPI(
     title="API d'Analyse et Visualisation de Données v4.2",
-    description="Une API robuste et cohérente pour l'analyse et la visualisation."
+    description="Une API robuste et cohérente pour l'analyse et la visualisation.",
+    lifespan=cycle_de_vie
 )
 
 # Configuration CORS
@@ -54,11 +102,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression gzip des réponses (JSON et rendus HTML statiques, très répétitifs)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # --- Répertoire de Stockage pour les Renders HTML ---
-DOSSIER_STOCKAGE = Path("storage/renders")
+DOSSIER_STOCKAGE = Path("storage/renders").resolve() # Résolu une seule fois au démarrage
 DOSSIER_STOCKAGE.mkdir(parents=True, exist_ok=True)
 app.mount("/static", StaticFiles(directory="storage"), name="static")
 
+# --- Cache des DataFrames téléversés (clé = empreinte du contenu) ---
+# Le même fichier est souvent envoyé plusieurs fois de suite (décrire, puis 2D, puis 3D) :
+# on évite de le re-parser à chaque requête.
+TAILLE_MAX_CACHE_DF = 8
+CACHE_DF: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+
+# --- Gabarit HTML des rendus Plotly (construit une seule fois) ---
+# Seul le JSON de la figure est injecté à chaque requête, au lieu de fig.to_html().
+# fig.to_json() échappe déjà '<' et '/', le JSON peut donc être placé tel quel dans <script>.
+GABARIT_HTML_PLOTLY = (
+    '<html>\n<head><meta charset="utf-8" /></head>\n<body>\n'
+    f'<script charset="utf-8" src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>\n'
+    '<div id="graphique" class="plotly-graph-div" style="height:100%; width:100%;"></div>\n'
+    '<script type="text/javascript">\n'
+    'var figure = {fig_json};\n'
+    'Plotly.newPlot("graphique", figure.data, figure.layout, {{"responsive": true}});\n'
+    '</script>\n</body>\n</html>'
+)
+
+# Au-delà de ce nombre de lignes, le nombre de doublons du résumé est estimé sur un échantillon
+LIGNES_MAX_DOUBLONS = 100_000
+
 
 # ==============================================================================
 # 1. MODÈLES PYDANTIC (Le "Contrat" de l'API)
@@ -76,6 +149,7 @@ class ParametresVisualisation(BaseModel):
     perplexite: int = Field(30, ge=1, description="[t-SNE] Perplexité.")
     n_voisins: int = Field(15, ge=2, description="[UMAP] Nombre de voisins.")
     dist_min: float = Field(0.1, ge=0.0, description="[UMAP] Distance minimale.")
+    echantillon_max: Optional[int] = Field(None, ge=10, description="[t-SNE/UMAP] Nombre maximal de lignes utilisées pour l'apprentissage.")
 
 class ParametresSauvegardeBdd(BaseModel):
     chemin_bdd: str = Field(..., description="Chemin du fichier BDD (ex: 'storage/ma_base.db').")
@@ -108,7 +182,7 @@ class ReponseVisualisation(BaseModel):
     methode_utilisee: str
     message: str
     url_rendu: str # URL pour accéder au fichier HTML stocké
-    contenu_html: str # Le HTML lui-même, pour un affichage direct
+    contenu_html: Optional[str] = None # Le HTML lui-même, seulement si demandé (inclure_html)
 
 
 # ==============================================================================
@@ -125,50 +199,114 @@ def obtenir_nettoyeur_json():
     return CleanDataframeForJson()
 
 # --- Helpers ---
-def obtenir_df_depuis_televersement(fichier: UploadFile) -> pd.DataFrame:
-    """Charge un DataFrame depuis un fichier téléversé en mémoire (robuste)."""
-    if not (fichier.filename.endswith('.csv') or fichier.filename.endswith('.xlsx')):
-        raise HTTPException(status_code=400, detail="Format de fichier non supporté (CSV ou XLSX requis).")
-
-    # Lire le contenu une seule fois
-    contenu = fichier.file.read() 
-    
+def lire_df_depuis_flux(nom_fichier: str, flux, colonnes: Optional[List[str]] = None) -> pd.DataFrame:
+    """Parse un flux binaire CSV ou XLSX en DataFrame (seulement `colonnes` si précisé)."""
     try:
-        if fichier.filename.endswith('.csv'):
-            # Gestion de l'encodage
+        if nom_fichier.endswith('.csv'):
+            # Gestion de l'encodage sur un échantillon de 64 Ko
+            # (le transcodage éventuel est fait par pyarrow)
+            echantillon_brut = flux.read(TAILLE_ECHANTILLON_CSV)
             try:
-                contenu_decode = contenu.decode('utf-8')
+                echantillon = codecs.getincrementaldecoder('utf-8')().decode(echantillon_brut)
+                encodage = 'utf8'
             except UnicodeDecodeError:
-                contenu_decode = contenu.decode('latin-1')
+                echantillon = echantillon_brut.decode('latin-1')
+                encodage = 'latin1'
 
             # Détection automatique du séparateur
-            echantillon = contenu_decode[:1000]
-            try:
-                dialecte = csv.Sniffer().sniff(echantillon)
-                separateur = dialecte.delimiter
-            except Exception:
-                separateur = ',' # valeur par défaut
+            separateur = detecter_separateur(echantillon)
+
+            if colonnes is not None:
+                # Colonnes absentes de l'en-tête ignorées à la lecture : l'appelant signale
+                # celles qui manquent (ex: 404 explicite pour la colonne de couleur)
+                ligne_entete = echantillon.lstrip('\ufeff').partition('\n')[0].rstrip('\r')
+                entete = next(csv.reader([ligne_entete], delimiter=separateur), [])
+                colonnes = [col for col in colonnes if col in entete]
+                if not colonnes:
+                    return pd.DataFrame()
 
-            # Lecture du CSV avec pandas
-            return pd.read_csv(StringIO(contenu_decode), sep=separateur)
+            # PyArrow, ou pandas pour un fichier irrégulier (lignes incomplètes, etc.)
+            return lire_csv_pyarrow(flux, separateur, encodage=encodage, colonnes=colonnes)
 
         else: # .xlsx
-            # Lire à partir de la variable 'contenu' (bytes)
-            return pd.read_excel(io.BytesIO(contenu)) 
+            # usecols appelable : les colonnes absentes sont ignorées au lieu de lever une erreur
+            colonnes_voulues = None if colonnes is None else set(colonnes)
+            return pd.read_excel(
+                flux,
+                usecols=None if colonnes_voulues is None else (lambda col: col in colonnes_voulues),
+                engine=MOTEUR_EXCEL
+            )
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Erreur de lecture du fichier: {e}")
 
-def sauvegarder_rendu_html(contenu_html: str, url_base_requete: str) -> str:
-    """Sauvegarde le HTML et retourne l'URL d'accès public."""
-    nom_fichier = f"rendu_{uuid.uuid4()}.html"
+def obtenir_df_depuis_televersement(fichier: UploadFile, colonnes: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Charge un DataFrame depuis un fichier téléversé, sans le copier entièrement en mémoire.
+    Si `colonnes` est précisé, seules ces colonnes sont lues.
+    Le fichier téléversé est fermé après lecture.
+    """
+    if not (fichier.filename.endswith('.csv') or fichier.filename.endswith('.xlsx')):
+        raise HTTPException(status_code=400, detail="Format de fichier non supporté (CSV ou XLSX requis).")
+
+    # UploadFile est déjà un SpooledTemporaryFile (sur disque au-delà d'un seuil) :
+    # on le lit en flux au lieu de charger tout son contenu en bytes.
+    flux = fichier.file
+    try:
+        flux.seek(0)
+
+        # Empreinte du contenu, calculée par blocs pour ne pas charger le fichier en mémoire
+        empreinte = hashlib.blake2b(digest_size=16)
+        for bloc in iter(lambda: flux.read(1 << 20), b''):
+            empreinte.update(bloc)
+        cle_cache = f"{Path(fichier.filename).suffix}:{empreinte.hexdigest()}"
+        if colonnes:
+            cle_cache += ":" + ",".join(colonnes)
+        flux.seek(0)
+
+        if cle_cache in CACHE_DF:
+            CACHE_DF.move_to_end(cle_cache)
+            # Copie superficielle : les ajouts/suppressions de colonnes ne touchent pas le cache
+            return CACHE_DF[cle_cache].copy(deep=False)
+
+        donnees = lire_df_depuis_flux(fichier.filename, flux, colonnes)
+    finally:
+        # Le téléversement n'est plus utile une fois parsé : on libère tout de suite son
+        # tampon mémoire / fichier temporaire au lieu d'attendre la fin de la requête
+        flux.close()
+
+    CACHE_DF[cle_cache] = donnees
+    if len(CACHE_DF) > TAILLE_MAX_CACHE_DF:
+        CACHE_DF.popitem(last=False)
+    return donnees.copy(deep=False)
+
+async def sauvegarder_rendu_html(contenu_html: str, url_base_requete: str) -> str:
+    """Sauvegarde le HTML (dans un thread, sans bloquer la boucle d'événements) et retourne l'URL d'accès public."""
+    nom_fichier = f"rendu_{uuid.uuid4().hex}.html"
     chemin_fichier = DOSSIER_STOCKAGE / nom_fichier
     
-    with open(chemin_fichier, "w", encoding="utf-8") as f:
-        f.write(contenu_html)
+    await asyncio.to_thread(chemin_fichier.write_text, contenu_html, encoding="utf-8")
     
     return f"{str(url_base_requete).rstrip('/')}/static/renders/{nom_fichier}"
 
+def colonnes_a_lire(colonnes: Optional[List[str]], parametres: ParametresVisualisation) -> Optional[List[str]]:
+    """Colonnes demandées par le client, plus la colonne de couleur (None = toutes les colonnes)."""
+    colonnes = [col for col in (colonnes or []) if col]
+    if not colonnes:
+        return None
+    if parametres.colonne_couleur:
+        colonnes.append(parametres.colonne_couleur)
+    return list(dict.fromkeys(colonnes)) # Sans doublons, ordre conservé
+
+def verifier_colonnes_lues(donnees: pd.DataFrame, colonnes: Optional[List[str]]):
+    """
+    Lève une 404 si des colonnes demandées par le client manquent dans le fichier.
+    La colonne de couleur est vérifiée ensuite par `creer_graphique_interactif`.
+    """
+    manquantes = [col for col in (colonnes or []) if col and col not in donnees.columns]
+    if manquantes:
+        raise HTTPException(status_code=404, detail=f"Colonne(s) introuvable(s) : {', '.join(manquantes)}.")
+
 # --- Fonction d'Orchestration pour la Visualisation ---
 def creer_graphique_interactif(
     donnees_brutes: pd.DataFrame, 
@@ -190,6 +328,10 @@ def creer_graphique_interactif(
         donnees_numeriques = Numeric_data(donnees_propres).num_col()
         if donnees_numeriques.empty:
             raise ValueError("Aucune colonne numérique trouvée ou données vides après nettoyage.")
+
+        # Centrage-réduction (z-score) compilé avec Numba, directement sur le tableau NumPy.
+        # float32 : deux fois moins de mémoire à parcourir, précision suffisante pour des coordonnées de graphique.
+        matrice_standardisee = standardiser(donnees_numeriques.to_numpy(dtype=np.float32))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Erreur de préparation des données: {e}")
 
@@ -198,38 +340,52 @@ def creer_graphique_interactif(
     if parametres.colonne_couleur:
         if parametres.colonne_couleur not in donnees_brutes.columns:
             raise HTTPException(status_code=404, detail=f"Colonne de couleur '{parametres.colonne_couleur}' introuvable.")
-        # On extrait les couleurs alignées avec les données numériques (après nettoyage)
-        donnees_couleur = donnees_propres.loc[donnees_numeriques.index, parametres.colonne_couleur]
+        # donnees_numeriques a le même index que donnees_propres : les valeurs sont déjà
+        # alignées, inutile de passer par une recherche .loc sur l'index
+        donnees_couleur = donnees_propres[parametres.colonne_couleur].to_numpy()
 
     # 3. Sélectionner la méthode
     nom_methode = methode
     donnees_reduites = None
+    lignes_projetees = None
     
     if methode == 'auto':
         selecteur = AutoSelector(donnees_numeriques, nombre_de_dimension=n_composantes)
         nom_methode = selecteur.selection_methode()
         print(f"[INFO] AutoSelector a choisi: {nom_methode.upper()}")
 
+    # t-SNE a besoin de plus de 3 x perplexité points pour construire ses voisinages
+    if nom_methode == 'tsne' and parametres.echantillon_max is not None and parametres.echantillon_max <= 3 * parametres.perplexite:
+        raise HTTPException(
+            status_code=422,
+            detail=f"echantillon_max ({parametres.echantillon_max}) doit être supérieur à 3 x perplexite ({3 * parametres.perplexite}) pour t-SNE."
+        )
+
     # 4. Exécuter la Réduction
     try:
         if nom_methode == 'acp':
-            donnees_reduites = MethodeACP(donnees_numeriques).acp_reduction(n_composantes)
+            donnees_reduites = MethodeACP(matrice_standardisee).acp_reduction(n_composantes)
             noms_colonnes = [f"PC_{i+1}" for i in range(n_composantes)]
         
         elif nom_methode == 'tsne':
             # Utilise le paramètre perplexity (supporté par le backend mis à jour)
-            donnees_reduites = MethodeTSNE(donnees_numeriques).tsne_reduction(
+            reducteur_tsne = MethodeTSNE(matrice_standardisee)
+            donnees_reduites = reducteur_tsne.tsne_reduction(
                 nombre_de_dimension=n_composantes,
-                perplexity=parametres.perplexite 
+                perplexity=parametres.perplexite,
+                max_samples=parametres.echantillon_max
             )
+            # Sans transform (scikit-learn), seules les lignes échantillonnées sont projetées
+            lignes_projetees = reducteur_tsne.indices_echantillon
             noms_colonnes = [f"TSNE_{i+1}" for i in range(n_composantes)]
         
         elif nom_methode == 'umap':
             # Utilise les paramètres n_neighbors et min_dist (supportés par le backend mis à jour)
-            donnees_reduites = MethodeUMAP(donnees_numeriques).umap_reduction(
+            donnees_reduites = MethodeUMAP(matrice_standardisee).umap_reduction(
                 nombre_de_dimension=n_composantes,
                 n_neighbors=parametres.n_voisins, 
-                min_dist=parametres.dist_min      
+                min_dist=parametres.dist_min,
+                max_samples=parametres.echantillon_max
             )
             noms_colonnes = [f"UMAP_{i+1}" for i in range(n_composantes)]
             
@@ -240,10 +396,14 @@ def creer_graphique_interactif(
     if donnees_reduites is None:
         raise HTTPException(status_code=500, detail="Échec de la réduction de dimension.")
 
-    donnees_graphique = pd.DataFrame(donnees_reduites, columns=noms_colonnes, index=donnees_numeriques.index)
-    
-    # Gestion robuste du hover_name (convertit en string pour éviter les erreurs)
-    donnees_graphique['hover_name'] = donnees_graphique.index.astype(str)
+    # Index converti en string une seule fois : il sert directement de hover_name
+    # (pas de colonne supplémentaire à construire)
+    index_graphique = donnees_numeriques.index.astype(str)
+    if lignes_projetees is not None:
+        index_graphique = index_graphique[lignes_projetees]
+        if donnees_couleur is not None:
+            donnees_couleur = donnees_couleur[lignes_projetees]
+    donnees_graphique = pd.DataFrame(donnees_reduites, columns=noms_colonnes, index=index_graphique)
     
     if donnees_couleur is not None:
         donnees_graphique[parametres.colonne_couleur] = donnees_couleur
@@ -252,7 +412,7 @@ def creer_graphique_interactif(
     args_graphique = {
         "title": f"{parametres.titre} ({nom_methode.upper()} {n_composantes}D)",
         "color": parametres.colonne_couleur,
-        "hover_name": "hover_name"
+        "hover_name": donnees_graphique.index
     }
 
     if n_composantes == 2:
@@ -260,7 +420,44 @@ def creer_graphique_interactif(
     else:
         fig = px.scatter_3d(donnees_graphique, x=noms_colonnes[0], y=noms_colonnes[1], z=noms_colonnes[2], **args_graphique)
 
-    return fig.to_html(full_html=True, include_plotlyjs='cdn'), nom_methode
+    return GABARIT_HTML_PLOTLY.format(fig_json=fig.to_json()), nom_methode
+
+def executer_graphique_interactif(*args) -> tuple:
+    """
+    Point d'entrée de `creer_graphique_interactif` dans le pool de processus.
+    HTTPException ne supportant pas pickle, l'erreur est renvoyée sous la forme (status_code, detail).
+    """
+    try:
+        return creer_graphique_interactif(*args), None
+    except HTTPException as e:
+        return None, (e.status_code, e.detail)
+
+async def creer_graphique_dans_pool(
+    donnees_brutes: pd.DataFrame,
+    methode: Literal['acp', 'tsne', 'umap', 'auto'],
+    n_composantes: Literal[2, 3],
+    parametres: ParametresVisualisation
+) -> tuple[str, str]:
+    """Exécute `creer_graphique_interactif` dans un processus séparé pour ne pas bloquer la boucle d'événements."""
+    boucle = asyncio.get_running_loop()
+    pool = app.state.pool
+    try:
+        resultat, erreur = await boucle.run_in_executor(
+            pool, executer_graphique_interactif, donnees_brutes, methode, n_composantes, parametres
+        )
+    except BrokenProcessPool:
+        # Un processus du pool est mort (OOM, plantage natif) : le pool est inutilisable.
+        # Il est remplacé une seule fois, même si plusieurs requêtes échouent en même temps.
+        if app.state.pool is pool:
+            app.state.pool = creer_pool_calcul()
+            pool.shutdown(wait=False, cancel_futures=True)
+        raise HTTPException(
+            status_code=503,
+            detail="Le processus de calcul s'est arrêté brutalement (mémoire insuffisante ?). Veuillez réessayer."
+        )
+    if erreur is not None:
+        raise HTTPException(status_code=erreur[0], detail=erreur[1])
+    return resultat
 
 # ==============================================================================
 # 3. ENDPOINTS (Les "Portes" de l'API)
@@ -344,21 +541,19 @@ async def decrire_donnees(
     donnees = obtenir_df_depuis_televersement(fichier)
     
     # --- RÉSILIENCE DES TYPES (Pour éviter les erreurs dues aux strings mal formatées) ---
-    # Nous conservons cette boucle, car elle est nécessaire pour que pd.describe() 
-    # ne plante pas sur les colonnes qui contiennent des caractères non-numériques.
-    donnees_resilientes = donnees.copy()
-    for col in donnees_resilientes.columns:
-        try:
-            donnees_resilientes[col] = pd.to_numeric(donnees_resilientes[col], errors='coerce')
-        except:
-            pass
-            
+    # Conversion nécessaire pour que pd.describe() ne plante pas sur les colonnes
+    # qui contiennent des caractères non-numériques. Seules les colonnes 'object'
+    # sont converties (en un seul appel) ; les colonnes déjà numériques sont
+    # partagées avec `donnees` sans copie.
+    colonnes_objet = donnees.select_dtypes(include=['object']).columns
+    donnees_resilientes = donnees.copy(deep=False)
+    if len(colonnes_objet) > 0:
+        donnees_resilientes[colonnes_objet] = donnees[colonnes_objet].apply(pd.to_numeric, errors='coerce')
+
     try:
-        service_analyse = Analyse()
-        
-        # Le backend corrigé peut être appelé directement
-        resume = service_analyse.summarize(donnees_resilientes)
-        df_statistiques = service_analyse.get_descriptive_stats(donnees_resilientes) 
+        # Méthodes statiques : pas d'instance d'Analyse à créer par requête
+        resume = Analyse.summarize(donnees_resilientes, max_rows_duplicates=LIGNES_MAX_DOUBLONS)
+        df_statistiques = Analyse.get_descriptive_stats(donnees_resilientes) 
         
         df_statistiques_nettoye = nettoyeur.clean_dataframe_for_json(df_statistiques)
         
@@ -398,9 +593,8 @@ async def decrire_donnees_distantes(
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Échec du chargement de la source : {e}")
     
-    service_analyse = Analyse()
-    resume = service_analyse.summarize(donnees)
-    df_statistiques = service_analyse.get_descriptive_stats(donnees)
+    resume = Analyse.summarize(donnees, max_rows_duplicates=LIGNES_MAX_DOUBLONS)
+    df_statistiques = Analyse.get_descriptive_stats(donnees)
     df_statistiques_nettoye = nettoyeur.clean_dataframe_for_json(df_statistiques)
     
     return ReponseDescription(
@@ -505,7 +699,9 @@ async def reduire_visualiser_2d(
     requete: Request,
     methode: Literal['acp', 'tsne', 'umap', 'auto'] = Form(..., description="Méthode de réduction."),
     fichier: UploadFile = File(...),
-    parametres_json: str = Form(ParametresVisualisation().model_dump_json(), description="Paramètres de visualisation en JSON")
+    parametres_json: str = Form(ParametresVisualisation().model_dump_json(), description="Paramètres de visualisation en JSON"),
+    colonnes: Optional[List[str]] = Form(None, description="Colonnes à lire (toutes par défaut). La colonne de couleur est ajoutée automatiquement."),
+    inclure_html: bool = Form(False, description="Renvoyer aussi le HTML du rendu dans la réponse (sinon seulement url_rendu).")
 ):
     """
     Endpoint unique pour toutes les visualisations 2D.
@@ -521,29 +717,32 @@ async def reduire_visualiser_2d(
         methode (Literal): Méthode de réduction de dimensionnalité.
         fichier (UploadFile): Le fichier téléversé contenant les données.
         parametres_json (str): Paramètres de visualisation en JSON.
+        colonnes (List[str] | None): Colonnes à lire dans le fichier (toutes si absent).
+        inclure_html (bool): Si True, le HTML est aussi renvoyé dans `contenu_html`.
 
     Returns:
         ReponseVisualisation: Détails du rendu créé.
 
     """
-    donnees = obtenir_df_depuis_televersement(fichier)
     try:
         parametres = ParametresVisualisation.model_validate_json(parametres_json)
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Erreur de validation des paramètres: {e}")
+    donnees = obtenir_df_depuis_televersement(fichier, colonnes=colonnes_a_lire(colonnes, parametres))
+    verifier_colonnes_lues(donnees, colonnes)
 
     # Appel du service d'orchestration en forçant n_composantes = 2
-    contenu_html, methode_utilisee = creer_graphique_interactif(donnees, methode, 2, parametres)
+    contenu_html, methode_utilisee = await creer_graphique_dans_pool(donnees, methode, 2, parametres)
     
     # Stockage du fichier HTML
-    url_rendu = sauvegarder_rendu_html(contenu_html, str(requete.base_url))
+    url_rendu = await sauvegarder_rendu_html(contenu_html, str(requete.base_url))
     
     return ReponseVisualisation(
         statut="success",
         methode_utilisee=methode_utilisee,
         message=f"Rendu 2D {methode_utilisee.upper()} créé avec succès.",
         url_rendu=url_rendu,
-        contenu_html=contenu_html
+        contenu_html=contenu_html if inclure_html else None
     )
 
 @app.post("/reduire-visualiser-3d", 
@@ -554,7 +753,9 @@ async def reduire_visualiser_3d(
     requete: Request,
     methode: Literal['acp', 'tsne', 'umap', 'auto'] = Form(..., description="Méthode de réduction."),
     fichier: UploadFile = File(...),
-    parametres_json: str = Form(ParametresVisualisation().model_dump_json(), description="Paramètres de visualisation en JSON")
+    parametres_json: str = Form(ParametresVisualisation().model_dump_json(), description="Paramètres de visualisation en JSON"),
+    colonnes: Optional[List[str]] = Form(None, description="Colonnes à lire (toutes par défaut). La colonne de couleur est ajoutée automatiquement."),
+    inclure_html: bool = Form(False, description="Renvoyer aussi le HTML du rendu dans la réponse (sinon seulement url_rendu).")
 ):
     """
     Endpoint unique pour toutes les visualisations 3D.
@@ -569,23 +770,26 @@ async def reduire_visualiser_3d(
         methode (Literal): Méthode de réduction de dimensionnalité.
         fichier (UploadFile): Le fichier téléversé contenant les données.
         parametres_json (str): Paramètres de visualisation en JSON.
+        colonnes (List[str] | None): Colonnes à lire dans le fichier (toutes si absent).
+        inclure_html (bool): Si True, le HTML est aussi renvoyé dans `contenu_html`.
     """
-    donnees = obtenir_df_depuis_televersement(fichier)
     try:
         parametres = ParametresVisualisation.model_validate_json(parametres_json)
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Erreur de validation des paramètres: {e}")
+    donnees = obtenir_df_depuis_televersement(fichier, colonnes=colonnes_a_lire(colonnes, parametres))
+    verifier_colonnes_lues(donnees, colonnes)
 
     # Appel du service d'orchestration en forçant n_composantes = 3
-    contenu_html, methode_utilisee = creer_graphique_interactif(donnees, methode, 3, parametres)
+    contenu_html, methode_utilisee = await creer_graphique_dans_pool(donnees, methode, 3, parametres)
     
     # Stockage du fichier HTML
-    url_rendu = sauvegarder_rendu_html(contenu_html, str(requete.base_url))
+    url_rendu = await sauvegarder_rendu_html(contenu_html, str(requete.base_url))
     
     return ReponseVisualisation(
         statut="success",
         methode_utilisee=methode_utilisee,
         message=f"Rendu 3D {methode_utilisee.upper()} créé avec succès.",
         url_rendu=url_rendu,
-        contenu_html=contenu_html
+        contenu_html=contenu_html if inclure_html else None
     )
\ No newline at end of file
@@ -1,17 +1,22 @@
-from typing import Union
+from typing import Optional, Union
 import pandas as pd
 import numpy as np
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
 
 class Analyse:
     """
     Analyse des données chargées dans la classe `DataLoad` depuis le fichier `loading.py`.
     """
-    def summarize(self, data: Union[pd.DataFrame, np.ndarray, str] = None) -> dict:
+    @staticmethod
+    def summarize(data: Union[pd.DataFrame, np.ndarray, str] = None, max_rows_duplicates: Optional[int] = None) -> dict:
         """
         Retourne un résumé statistique de la donnée chargée.
         
         Args:
             data (pd.DataFrame | np.ndarray | str) : Les données à résumer (valeur par défaut est `None`).
+            max_rows_duplicates (int | None) : Nombre maximal de lignes utilisées pour compter les doublons.
+                Au-delà, le nombre est estimé sur les `max_rows_duplicates` premières lignes
+                (`duplicates_estimated` vaut alors `True`). Par défaut `None` : comptage exact.
             
         Return:
             dict: L'ensemble des informations résumé dans un dictionnaire.
@@ -20,12 +25,21 @@ class Analyse:
             raise ValueError("Aucune donnée chargée.")
 
         if isinstance(data, pd.DataFrame):
+            # isna() travaille bloc par bloc, sans copie du DataFrame
+            missing = data.isna().sum()
+
+            # Le hachage des lignes de duplicated() est coûteux : on peut le limiter à un échantillon
+            duplicates_estimated = max_rows_duplicates is not None and len(data) > max_rows_duplicates
+            rows_for_duplicates = data.head(max_rows_duplicates) if duplicates_estimated else data
+
             return {
                 'shape': data.shape,
-                'columns': list(data.columns),
-                'types': data.dtypes.astype(str).to_dict(),
-                'missing_values': data.isnull().sum().to_dict(),
-                'duplicates': data.duplicated().sum()
+                'columns': data.columns.tolist(),
+                # Dictionnaire construit directement, sans Series intermédiaire (astype + to_dict)
+                'types': {col: str(dtype) for col, dtype in zip(data.columns, data.dtypes.values)},
+                'missing_values': {col: int(nb) for col, nb in zip(data.columns, missing.to_numpy())},
+                'duplicates': int(rows_for_duplicates.duplicated().sum()),
+                'duplicates_estimated': duplicates_estimated
             }
         elif isinstance(data, np.ndarray):
             return {
@@ -42,7 +56,8 @@ class Analyse:
         else:
             raise TypeError("Type de données non supporté pour le résumé.")
 
-    def get_descriptive_stats(self,df: pd.DataFrame) -> pd.DataFrame:
+    @staticmethod
+    def get_descriptive_stats(df: pd.DataFrame) -> pd.DataFrame:
         """
         Retourne des statistiques descriptives pour les colonnes numériques et catégorielles d'un DataFrame.
         
@@ -56,8 +71,14 @@ class Analyse:
         if not isinstance(df, pd.DataFrame):
             raise TypeError("Les données ne sont pas tabulaires (DataFrame).")
         
-        numeric_stats = df.describe(include=np.number).transpose()
-        categorical_stats = df.describe(include='object').transpose()
+        # describe() n'est appelé que si le type de colonnes est présent
+        # (sinon pandas lève "No objects to concatenate" après un calcul inutile).
+        # Les types sont lus directement dans df.dtypes, sans construire de sous-DataFrame.
+        has_num = any(is_numeric_dtype(t) and not is_bool_dtype(t) for t in df.dtypes)
+        has_obj = any(t == object for t in df.dtypes)
+
+        numeric_stats = df.describe(include=np.number).transpose() if has_num else pd.DataFrame()
+        categorical_stats = df.describe(include='object').transpose() if has_obj else pd.DataFrame()
   
         # --- FIX ROBUSTESSE CONTRE L'ERREUR "No objects to concatenate" ---
         # Crée une liste contenant uniquement les DataFrames qui NE SONT PAS vides.
@@ -74,4 +95,4 @@ class Analyse:
             return pd.DataFrame({'Statut': ['Aucune colonne à décrire trouvée.']})
 
         # Concaténation sécurisée (la fonction corrigée n'échouera plus ici)
-        return pd.concat(stats_list)
\ No newline at end of file
+        return pd.concat(stats_list, copy=False, sort=False)
\ No newline at end of file
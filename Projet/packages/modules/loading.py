@@ -16,21 +16,437 @@ import json
 import yaml
 import sqlite3
 import pandas as pd
+from pandas.api.types import infer_dtype
 import requests
 import io
+import shutil
+import hashlib
+import mmap
+import copy
+from stat import S_ISREG
 from pathlib import Path
 import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pacsv
 
 from PIL import Image
-from typing import Union, Optional
+from typing import Dict, List, Union, Optional
 from pydantic import BaseModel
 from pydantic import field_serializer, field_validator
 
+# Décodeur JSON le plus rapide disponible (orjson > ujson > json de la bibliothèque standard)
+try:
+    import orjson
+    _loads_rapide = orjson.loads
+except ImportError:
+    try:
+        import ujson
+        _loads_rapide = ujson.loads
+    except ImportError:
+        _loads_rapide = None
+
+def _loads(contenu):
+    """
+    Décode avec le décodeur rapide, puis avec json en cas de refus : orjson rejette
+    NaN / Infinity, que json.loads accepte (et que json.dumps écrit par défaut).
+    """
+    if _loads_rapide is not None:
+        try:
+            return _loads_rapide(contenu)
+        except ValueError:
+            pass
+    return json.loads(contenu)
+
+# Lecteur Excel en Rust (python-calamine, .xls et .xlsx) s'il est installé ;
+# sinon None laisse pandas choisir son moteur habituel (openpyxl / xlrd).
+try:
+    import python_calamine  # noqa: F401
+    MOTEUR_EXCEL = "calamine"
+except ImportError:
+    MOTEUR_EXCEL = None
+
+# Chargeur YAML en C (libyaml) si PyYAML a été compilé avec, sinon chargeur Python
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 # import pyarrow.parquet as pq
 # from pathlib import Path
 
+# Valeurs que pd.read_csv considère comme manquantes par défaut : le lecteur PyArrow
+# reçoit la même liste pour que les deux moteurs produisent les mêmes NaN.
+VALEURS_NULLES_CSV = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+
+def options_conversion_csv(colonnes=None, types_colonnes=None) -> pacsv.ConvertOptions:
+    """Options de conversion PyArrow alignées sur pd.read_csv (valeurs manquantes, texte vide = NaN)."""
+    return pacsv.ConvertOptions(
+        strings_can_be_null=True,
+        null_values=VALEURS_NULLES_CSV,
+        include_columns=colonnes,
+        column_types=types_colonnes
+    )
+
+def renommer_colonnes_dupliquees(noms_colonnes: List[str]) -> List[str]:
+    """Renomme les colonnes en double comme pandas ('col', 'col.1', 'col.2', ...)."""
+    vus: Dict[str, int] = {}
+    noms_uniques = []
+    for nom in noms_colonnes:
+        if nom in vus:
+            vus[nom] += 1
+            noms_uniques.append(f"{nom}.{vus[nom]}")
+        else:
+            vus[nom] = 0
+            noms_uniques.append(nom)
+    return noms_uniques
+
+def lire_table_csv(source, read_options=None, parse_options=None, colonnes=None) -> pa.Table:
+    """
+    Lit un CSV avec PyArrow en gardant la sémantique de pd.read_csv :
+    mêmes valeurs manquantes, colonnes en double renommées ('col.1'), et dates/heures
+    laissées en texte (pandas ne les convertit pas sans parse_dates). Le schéma est déduit
+    du premier bloc, puis le fichier est lu une seule fois avec les colonnes temporelles
+    forcées en texte. Un fichier annoncé en UTF-8 qui n'en est pas est relu en latin-1.
+
+    Args:
+        source : Chemin, flux binaire ou fichier PyArrow (repositionné au début avant chaque lecture).
+        read_options / parse_options : Options PyArrow de lecture et de découpage.
+        colonnes : Colonnes à lire (None = toutes).
+
+    Return:
+        pa.Table: La table lue.
+    """
+    options_lecture = read_options or pacsv.ReadOptions()
+
+    def lire(lecteur, types_colonnes=None):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return lecteur(
+            source,
+            read_options=options_lecture,
+            parse_options=parse_options,
+            convert_options=options_conversion_csv(colonnes, types_colonnes)
+        )
+
+    def colonnes_temporelles(schema) -> dict:
+        return {champ.name: pa.string() for champ in schema if pa.types.is_temporal(champ.type)}
+
+    def octets_non_utf8(schema) -> bool:
+        # PyArrow garde en binaire les colonnes dont les octets ne sont pas de l'UTF-8 valide
+        return options_lecture.encoding.lower().replace("-", "") == "utf8" and any(
+            pa.types.is_binary(type_colonne) for type_colonne in schema.types
+        )
+
+    def passer_en_latin1():
+        nonlocal options_lecture
+        options_lecture = copy.copy(options_lecture)
+        options_lecture.encoding = "latin1"
+
+    # open_csv ne convertit que le premier bloc : de quoi connaître les types inférés
+    schema = lire(pacsv.open_csv).schema
+    if octets_non_utf8(schema):
+        passer_en_latin1()
+        schema = lire(pacsv.open_csv).schema
+    types_colonnes = colonnes_temporelles(schema)
+    table = lire(pacsv.read_csv, types_colonnes)
+
+    # Cas rares : octets non UTF-8 après le premier bloc, ou colonne vide sur tout
+    # le premier bloc et reconnue comme date plus loin
+    if octets_non_utf8(table.schema):
+        passer_en_latin1()
+        table = lire(pacsv.read_csv, types_colonnes)
+    types_restants = colonnes_temporelles(table.schema)
+    if types_restants:
+        table = lire(pacsv.read_csv, {**types_colonnes, **types_restants})
+
+    return table.rename_columns(renommer_colonnes_dupliquees(table.column_names))
+
+def lire_csv_par_blocs(source, sep: str, max_rows: int, chunksize: int = 200_000) -> pd.DataFrame:
+    """
+    Lit un CSV par blocs de `chunksize` lignes et s'arrête dès que `max_rows` lignes sont lues,
+    sans matérialiser le reste du fichier.
+
+    Args:
+        source : Chemin local, URL ou flux lisible par `pd.read_csv`.
+        sep (str) : Séparateur de colonnes.
+        max_rows (int) : Nombre maximal de lignes à conserver.
+        chunksize (int) : Nombre de lignes lues par bloc.
+
+    Return:
+        pd.DataFrame: Les `max_rows` premières lignes (ou moins si le fichier est plus court).
+    """
+    blocs = []
+    total = 0
+    with pd.read_csv(source, sep=sep, chunksize=chunksize, low_memory=False) as lecteur:
+        for bloc in lecteur:
+            bloc = bloc.head(max_rows - total)
+            blocs.append(bloc)
+            total += len(bloc)
+            if total >= max_rows:
+                break
+    if len(blocs) == 1:
+        return blocs[0]
+    return pd.concat(blocs, copy=False)
+
+# Racine autorisée pour les chemins locaux (symlinks résolus), calculée une seule fois
+PROJECT_ROOT = os.path.realpath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+# Cache Parquet des fichiers locaux déjà analysés (clé : chemin, date de modification, taille).
+# Hors de `storage`, servi publiquement sous /static. Au-delà de TAILLE_MAX_CACHE octets,
+# les entrées les moins récemment utilisées sont supprimées.
+DOSSIER_CACHE = Path(__file__).resolve().parents[2] / "cache"
+FORMATS_MIS_EN_CACHE = ('csv', 'xls', 'xlsx', 'json', 'yaml', 'yml')
+TAILLE_MAX_CACHE = 512 * 1024 * 1024
+
+def cache_compatible(df: pd.DataFrame) -> bool:
+    """
+    Vrai si le DataFrame revient identique d'un aller-retour Parquet : une colonne objet
+    contenant des listes, dicts ou tableaux (type 'mixed') reviendrait en np.ndarray.
+    """
+    return not any(
+        infer_dtype(serie, skipna=True).startswith("mixed")
+        for _, serie in df.select_dtypes(include="object").items()
+    )
+
+def purger_cache(taille_max: int = TAILLE_MAX_CACHE):
+    """Supprime les entrées les plus anciennes (date de modification) jusqu'à repasser sous `taille_max`."""
+    entrees = []
+    for chemin in DOSSIER_CACHE.glob("*.parquet"):
+        try:
+            infos = chemin.stat()
+        except OSError:
+            continue
+        entrees.append((infos.st_mtime, infos.st_size, chemin))
+    total = sum(taille for _, taille, _ in entrees)
+    for _, taille, chemin in sorted(entrees):
+        if total <= taille_max:
+            break
+        chemin.unlink(missing_ok=True)
+        total -= taille
+
+def optimiser_types(df: pd.DataFrame, seuil_categorie: float = 0.5) -> pd.DataFrame:
+    """
+    Réduit l'empreinte mémoire d'un DataFrame (modifié sur place) :
+    entiers réduits au plus petit type qui contient leurs valeurs, flottants convertis
+    en float32, et colonnes texte peu variées converties en `category`.
+
+    Args:
+        df (pd.DataFrame) : DataFrame à optimiser.
+        seuil_categorie (float) : Ratio maximal valeurs distinctes / lignes pour passer en `category`.
+
+    Return:
+        pd.DataFrame: Le même DataFrame, avec des types plus compacts.
+    """
+    for colonne in df.select_dtypes(include="integer").columns:
+        df[colonne] = pd.to_numeric(df[colonne], downcast="integer")
+    for colonne in df.select_dtypes(include="float").columns:
+        df[colonne] = pd.to_numeric(df[colonne], downcast="float")
+    if len(df):
+        for colonne in df.select_dtypes(include="object").columns:
+            # Seul le texte passe en `category` : listes/dicts (JSON imbriqué) ne sont pas hachables
+            if infer_dtype(df[colonne], skipna=True) != "string":
+                continue
+            if df[colonne].nunique() / len(df) < seuil_categorie:
+                df[colonne] = df[colonne].astype("category")
+    return df
+
+
+def json_vers_dataframe(data) -> pd.DataFrame:
+    """
+    Convertit des données JSON/YAML déjà décodées en DataFrame.
+
+    Une liste d'enregistrements plats (aucune valeur dict/list) est passée directement à
+    `pd.DataFrame.from_records` ; `pd.json_normalize` n'est utilisé que si des données imbriquées
+    doivent être aplaties.
+
+    Args:
+        data : Objet Python issu du décodage (liste de dictionnaires, dictionnaire, ...).
+
+    Return:
+        pd.DataFrame: Les données sous forme tabulaire.
+    """
+    if (
+        isinstance(data, list)
+        and data
+        and all(isinstance(enregistrement, dict) for enregistrement in data)
+        and not any(
+            isinstance(valeur, (dict, list))
+            for enregistrement in data
+            for valeur in enregistrement.values()
+        )
+    ):
+        return pd.DataFrame.from_records(data)
+    return pd.json_normalize(data)
+
+
+# ==========================================================
+# --- Chargeurs par format (sélectionnés par dictionnaire) ---
+# ==========================================================
+# Détection du séparateur CSV (commune aux fichiers locaux, distants et téléversés) :
+# candidats par ordre de priorité, et taille de l'échantillon lu en tête de fichier.
+SEPARATEURS_CSV = (";", "|", "\t", ",")
+TAILLE_ECHANTILLON_CSV = 65536
+
+# Blocs de 8 Mo pour le lecteur CSV de PyArrow : moins de blocs à assembler qu'avec 1 Mo
+TAILLE_BLOC_CSV = 8 << 20
+
+# Au-delà de cette taille, les fichiers locaux (CSV, Parquet, images) sont projetés en mémoire
+# (mmap) : le cache de pages du système fournit les données à la demande, sans copie en espace
+# utilisateur. En dessous, le coût de mise en place du mmap n'est pas rentable.
+TAILLE_MIN_MMAP = 4_000_000
+
+def detecter_separateur(echantillon: Union[str, bytes]) -> str:
+    """
+    Devine le séparateur d'un CSV sur un échantillon (texte décodé, ou octets bruts) :
+    parmi les candidats présents dans l'en-tête, le plus fréquent dans l'échantillon
+    l'emporte ; à égalité, l'ordre de SEPARATEURS_CSV décide.
+    """
+    if isinstance(echantillon, bytes):
+        # Séparateurs ASCII : latin-1 décode n'importe quel octet, sans erreur ni décalage
+        echantillon = echantillon.decode("latin-1")
+    en_tete = echantillon.split("\n", 1)[0]
+    candidats = [sep for sep in SEPARATEURS_CSV if sep in en_tete] or SEPARATEURS_CSV
+    occurrences = {sep: echantillon.count(sep) for sep in candidats}
+    return max(occurrences, key=occurrences.get)
+
+def lire_csv_pyarrow(
+    source,
+    sep: str = ",",
+    memoire_mappee: bool = False,
+    encodage: str = "utf8",
+    colonnes: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Parseur C++ multi-thread de PyArrow (voir `lire_table_csv`) ; repli sur pandas pour les
+    fichiers que PyArrow refuse (ex: lignes de longueurs inégales).
+    Si `memoire_mappee`, le chemin `source` est lu par PyArrow via un mmap.
+    Si `colonnes` est précisé, seules ces colonnes sont lues.
+    """
+    options_lecture = pacsv.ReadOptions(encoding=encodage, block_size=TAILLE_BLOC_CSV)
+    options_decoupage = pacsv.ParseOptions(delimiter=sep)
+    try:
+        if memoire_mappee:
+            with pa.memory_map(source, "r") as fichier_mappe:
+                table = lire_table_csv(fichier_mappe, options_lecture, options_decoupage, colonnes)
+        else:
+            table = lire_table_csv(source, options_lecture, options_decoupage, colonnes)
+        return table.to_pandas(self_destruct=True)
+    except pa.ArrowInvalid:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return pd.read_csv(source, sep=sep, encoding=encodage, encoding_errors='replace', usecols=colonnes)
+
+def charger_csv_local(chemin: str, max_rows: Optional[int] = None, chunksize: int = 200_000, taille_fichier: int = 0, **options) -> pd.DataFrame:
+    with open(chemin, 'rb') as contenu_du_fichier:
+        sep = detecter_separateur(contenu_du_fichier.read(TAILLE_ECHANTILLON_CSV))
+    try:
+        if max_rows is not None:
+            # Lecture par blocs avec arrêt anticipé : le reste du fichier n'est pas lu
+            return lire_csv_par_blocs(chemin, sep, max_rows, chunksize)
+        return lire_csv_pyarrow(chemin, sep, memoire_mappee=taille_fichier > TAILLE_MIN_MMAP)
+    except pd.errors.ParserError:
+        raise pd.errors.ParserError(f"Erreur de parsing CSV. Assurez-vous que le séparateur est l'un de : {list(SEPARATEURS_CSV)}")
+
+def charger_excel(source, **options) -> pd.DataFrame:
+    return pd.read_excel(source, engine=MOTEUR_EXCEL)
+
+def charger_json_local(chemin: str, **options) -> pd.DataFrame:
+    with open(chemin, 'rb') as f:
+        data = _loads(f.read())
+    return json_vers_dataframe(data)
+
+def charger_yaml_local(chemin: str, **options) -> pd.DataFrame:
+    with open(chemin, 'r', encoding='utf-8') as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+    return json_vers_dataframe(data)
+
+def charger_parquet(chemin: str, taille_fichier: int = 0, **options) -> pd.DataFrame:
+    if taille_fichier > TAILLE_MIN_MMAP:
+        with pa.memory_map(chemin, "r") as fichier_mappe:
+            return pd.read_parquet(fichier_mappe)
+    return pd.read_parquet(chemin)
+
+def charger_sql(chemin: str, sql_query: str = None, db_path: str = None, **options) -> pd.DataFrame:
+    if not (db_path and sql_query):
+        raise ValueError("Format de fichier local non supporté : 'sql' (db_path et sql_query sont requis)")
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query(sql_query, conn)
+    finally:
+        conn.close()
+
+def charger_image(chemin: str, image_as_dataframe: bool = False, taille_fichier: int = 0, **options) -> Union[pd.DataFrame, np.ndarray]:
+    if taille_fichier > TAILLE_MIN_MMAP:
+        with open(chemin, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as fichier_mappe:
+            image = Image.open(fichier_mappe).convert('RGB') # convert() décode l'image tant que le mmap est ouvert
+    else:
+        image = Image.open(chemin).convert('RGB')
+    img_array = np.array(image)
+    if not image_as_dataframe:
+        return img_array
+    h, w, c = img_array.shape
+    # Colonnes construites en C par NumPy (pixels en uint8, aucune liste Python de coordonnées)
+    pixels = np.ascontiguousarray(img_array.reshape(-1, c), dtype=np.uint8)
+    ys, xs = np.mgrid[0:h, 0:w]
+    return pd.DataFrame({
+        "R": pixels[:, 0],
+        "G": pixels[:, 1],
+        "B": pixels[:, 2],
+        "x": xs.ravel(),
+        "y": ys.ravel()
+    })
+
+def charger_texte_local(chemin: str, **options) -> str:
+    with open(chemin, 'r', encoding='utf-8') as f:
+        return f.read()
+
+# Chargeurs distants : ils reçoivent le contenu déjà téléchargé (io.BytesIO)
+def charger_csv_distant(tampon: io.BytesIO, **options) -> pd.DataFrame:
+    return lire_csv_pyarrow(tampon, detecter_separateur(tampon.getbuffer()[:TAILLE_ECHANTILLON_CSV].tobytes()))
+
+def charger_json_distant(tampon: io.BytesIO, **options) -> pd.DataFrame:
+    return json_vers_dataframe(_loads(tampon.getvalue())) # Décode le JSON depuis les bytes téléchargés
+
+def charger_yaml_distant(tampon: io.BytesIO, **options) -> pd.DataFrame:
+    return json_vers_dataframe(yaml.load(tampon.getvalue(), Loader=_YamlLoader)) # Lit depuis les bytes
+
+def charger_texte_distant(tampon: io.BytesIO, encodage_texte: str = 'utf-8', **options) -> str:
+    return tampon.getvalue().decode(encodage_texte, errors='replace') # Renvoie le texte brut
+
+CHARGEURS_LOCAUX = {
+    'csv': charger_csv_local,
+    'xls': charger_excel,
+    'xlsx': charger_excel,
+    'json': charger_json_local,
+    'yaml': charger_yaml_local,
+    'yml': charger_yaml_local,
+    'parquet': charger_parquet,
+    'sql': charger_sql,
+    'png': charger_image,
+    'jpg': charger_image,
+    'jpeg': charger_image,
+    'txt': charger_texte_local,
+}
+
+# Note : Parquet, SQL, Image depuis une URL ne sont pas implémentés
+# car ils nécessitent une logique plus complexe (ex: authentification)
+CHARGEURS_DISTANTS = {
+    'csv': charger_csv_distant,
+    'xls': charger_excel,
+    'xlsx': charger_excel,
+    'json': charger_json_distant,
+    'yaml': charger_yaml_distant,
+    'yml': charger_yaml_distant,
+    'txt': charger_texte_distant,
+}
+
+
 class DataLoader(BaseModel):
     df: Optional[pd.DataFrame] = None
+    format: Optional[str] = None
     model_config = {"arbitrary_types_allowed": True,"str_max_length": None}
 
     @field_serializer("df")
@@ -48,10 +464,23 @@ class DataLoader(BaseModel):
         file_path: str,
         sql_query: str = None,
         db_path: str = None,
-        image_as_dataframe: bool = False) -> Union[pd.DataFrame, np.ndarray, str]:
+        image_as_dataframe: bool = False,
+        max_rows: Optional[int] = None,
+        chunksize: int = 200_000,
+        use_cache: bool = True,
+        optimize_dtypes: bool = False) -> Union[pd.DataFrame, np.ndarray, str]:
         """
         Charge des données en fonction des fichiers chargés (locaux ou distants).
         ... (args et returns inchangés) ...
+
+        max_rows / chunksize : pour les CSV, ne lit que les `max_rows` premières lignes,
+        par blocs de `chunksize` lignes (None = fichier entier).
+
+        use_cache : pour un fichier local tabulaire, réutilise le DataFrame déjà analysé
+        (stocké en Parquet) tant que le fichier n'a pas été modifié.
+
+        optimize_dtypes : réduit les types du DataFrame chargé (voir `optimiser_types`) ;
+        les flottants passent en float32, donc avec une précision réduite.
         """
         
         # --- MODIFICATION ---
@@ -65,24 +494,55 @@ class DataLoader(BaseModel):
         
         # --- AJOUT : Sécurité ---
         # Valider que le chemin local est sécurisé
+        # Un seul os.stat fournit ensuite existence, taille et date de modification.
+        infos_fichier = None
         if not is_url:
-            PROJECT_ROOT = Path(__file__).resolve().parents[3] # Remonte au dossier 'Projet'
-            file_path_abs = Path(file_path).resolve()
-            
+            file_path_abs = os.path.realpath(file_path)
             try:
-                file_path_abs.relative_to(PROJECT_ROOT)
-            except ValueError:
+                autorise = os.path.commonpath([file_path_abs, PROJECT_ROOT]) == PROJECT_ROOT
+            except ValueError: # Ex: lecteurs différents sous Windows
+                autorise = False
+            if not autorise:
                 raise ValueError("Accès non autorisé : le chemin spécifié est en dehors du répertoire de travail.")
 
+            try:
+                infos_fichier = os.stat(file_path_abs)
+            except OSError:
+                infos_fichier = None
+
         # --- AJOUT ---
-        # Obtenir le type de fichier (suffixe) en utilisant Pathlib
-        try:
-            file_type = Path(file_path).suffix.lower().replace('.', '')
-        except Exception as e:
-            raise ValueError(f"Impossible de déterminer le type de fichier depuis le chemin : {e}")
+        # Obtenir le type de fichier (suffixe)
+        file_type = os.path.splitext(file_path)[1][1:].lower()
 
         self.format = file_type
 
+        # --- AJOUT : Cache Parquet ---
+        # Un fichier local inchangé (même date de modification et même taille) est relu
+        # depuis sa version Parquet, bien plus rapide à charger qu'un CSV/JSON/Excel.
+        chemin_cache = None
+        if use_cache and infos_fichier is not None and S_ISREG(infos_fichier.st_mode) and (
+            file_type in FORMATS_MIS_EN_CACHE or (file_type in ['png', 'jpg', 'jpeg'] and image_as_dataframe)
+        ):
+            cle = hashlib.blake2b(
+                f"{file_path_abs}:{infos_fichier.st_mtime_ns}:{infos_fichier.st_size}:{max_rows}".encode(),
+                digest_size=16
+            ).hexdigest()
+            chemin_cache = DOSSIER_CACHE / f"{cle}.parquet"
+            if chemin_cache.exists():
+                try:
+                    df_cache = pd.read_parquet(chemin_cache)
+                except Exception:
+                    df_cache = None
+                    chemin_cache.unlink(missing_ok=True) # Cache illisible : on relit la source
+                if df_cache is not None:
+                    print(f"Chargement des données depuis le cache : {file_path}")
+                    try:
+                        os.utime(chemin_cache) # Entrée récemment utilisée : purgée en dernier
+                    except OSError:
+                        pass
+                    self.df = optimiser_types(df_cache) if optimize_dtypes else df_cache
+                    return self.df
+
         try:
             # ==========================================================
             # --- CAS 1 : Le chemin est une URL distante ---
@@ -90,107 +550,72 @@ class DataLoader(BaseModel):
             if is_url:
                 print(f"Chargement des données depuis une URL distante : {file_path}")
 
-                if file_type in ['csv', 'xls', 'xlsx']:
-                    # --- MODIFICATION ---
-                    # Pandas peut lire les CSV et Excel directement depuis une URL
-                    # C'est la méthode la plus simple et la plus efficace.
-                    if file_type == 'csv':
-                        self.df = pd.read_csv(file_path)
-                    elif file_type in ['xls', 'xlsx']:
-                        self.df = pd.read_excel(file_path)
-                
-                else:
-                    # --- AJOUT ---
-                    # Pour les autres types (JSON, TXT, etc.), nous devons
-                    # télécharger le contenu d'abord avec 'requests'.
-                    try:
-                        r = requests.get(file_path)
+                chargeur = CHARGEURS_DISTANTS.get(file_type)
+                if chargeur is None:
+                    raise ValueError(f"Format de fichier distant non supporté : '{file_type}'")
+
+                # --- MODIFICATION ---
+                # Un seul téléchargement en flux pour tous les formats : pandas ne
+                # refait plus sa propre requête HTTP pour les CSV/Excel.
+                try:
+                    with requests.get(file_path, stream=True, timeout=30) as r:
                         r.raise_for_status() # Lève une erreur si 404, 500, etc.
-                    except requests.exceptions.RequestException as e:
-                        raise Exception(f"Erreur de téléchargement de l'URL '{file_path}': {e}")
-
-                    if file_type == 'json':
-                        data = r.json() # Décode le JSON depuis la réponse
-                        self.df = pd.json_normalize(data)
-                    
-                    elif file_type in ['yaml', 'yml']:
-                        data = yaml.safe_load(r.content) # Lit depuis les bytes
-                        self.df = pd.json_normalize(data)
-                    
-                    elif file_type == 'txt':
-                        self.df = r.text # Renvoie le texte brut
-                    
-                    # Note : Parquet, SQL, Image depuis une URL ne sont pas implémentés
-                    # car ils nécessitent une logique plus complexe (ex: authentification)
-                    else:
-                        raise ValueError(f"Format de fichier distant non supporté : '{file_type}'")
+                        r.raw.decode_content = True # Décompression gzip/deflate éventuelle
+
+                        if file_type == 'csv' and max_rows is not None:
+                            # Lecture directe du flux : le téléchargement s'arrête avec la lecture
+                            self.df = lire_csv_par_blocs(r.raw, ',', max_rows, chunksize)
+                            chargeur = None
+                        else:
+                            tampon = io.BytesIO()
+                            shutil.copyfileobj(r.raw, tampon)
+                            tampon.seek(0)
+                        encodage_texte = r.encoding or 'utf-8'
+                except requests.exceptions.RequestException as e:
+                    raise Exception(f"Erreur de téléchargement de l'URL '{file_path}': {e}")
+
+                if chargeur is not None:
+                    self.df = chargeur(tampon, encodage_texte=encodage_texte)
 
             # ==========================================================
             # --- CAS 2 : Le chemin est un fichier local ---
             # ==========================================================
-            elif os.path.exists(file_path):
+            elif infos_fichier is not None:
                 print(f"Chargement des données depuis un chemin local : {file_path}")
-                
-                # --- MODIFICATION ---
-                # Votre logique de détection de séparateur pour CSV (conservée)
-                if file_type == 'csv':
-                    sepateur_valeurs = [";", "|", "\t", ","]
-                    index_sepateur = 0
-                    
-                    # Lire la première ligne pour deviner le séparateur
-                    with open(file=file_path, encoding="utf-8") as contenu_du_fichier:
-                        premiere_ligne = contenu_du_fichier.readline()
-                    
-                    for i, sep in enumerate(sepateur_valeurs):
-                        if sep in premiere_ligne:
-                            index_sepateur = i
-                            break # Trouvé !
-                        
-                    try:
-                        self.df = pd.read_csv(file_path, sep=sepateur_valeurs[index_sepateur])
-                    except pd.errors.ParserError:
-                        raise pd.errors.ParserError(f"Erreur de parsing CSV. Assurez-vous que le séparateur est l'un de : {sepateur_valeurs}")
-                
-                # Logique pour les autres fichiers locaux (conservée)
-                elif file_type in ['xls', 'xlsx']:
-                    self.df = pd.read_excel(file_path)
-                elif file_type == 'json':
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    self.df = pd.json_normalize(data)
-                elif file_type in ['yaml', 'yml']:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = yaml.safe_load(f)
-                    self.df = pd.json_normalize(data)
-                elif file_type == 'parquet':
-                    self.df = pd.read_parquet(file_path)
-                elif file_type == 'sql' and db_path and sql_query:
-                    conn = sqlite3.connect(db_path)
-                    self.df = pd.read_sql_query(sql_query, conn)
-                    conn.close()
-                elif file_type in ['png', 'jpg', 'jpeg']:
-                    image = Image.open(file_path).convert('RGB')
-                    img_array = np.array(image)
-                    if image_as_dataframe:
-                        h, w, c = img_array.shape
-                        pixels = img_array.reshape(-1, c)
-                        coords = [(x, y) for y in range(h) for x in range(w)]
-                        self.df = pd.DataFrame(pixels, columns=["R", "G", "B"])
-                        self.df["x"] = [coord[0] for coord in coords]
-                        self.df["y"] = [coord[1] for coord in coords]
-                    else:
-                        self.df = img_array
-                elif file_type == 'txt':
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        self.df = f.read()
-                else:
+
+                chargeur = CHARGEURS_LOCAUX.get(file_type)
+                if chargeur is None:
                     raise ValueError(f"Format de fichier local non supporté : '{file_type}'")
-            
+                self.df = chargeur(
+                    file_path,
+                    sql_query=sql_query,
+                    db_path=db_path,
+                    image_as_dataframe=image_as_dataframe,
+                    max_rows=max_rows,
+                    chunksize=chunksize,
+                    taille_fichier=infos_fichier.st_size
+                )
+
             else:
                 # --- MODIFICATION ---
                 # Si ce n'est ni une URL ni un fichier local existant
                 raise FileNotFoundError(f"Erreur : Le fichier à l'adresse '{file_path}' est introuvable.")
 
+            if chemin_cache is not None and isinstance(self.df, pd.DataFrame) and cache_compatible(self.df):
+                chemin_temporaire = chemin_cache.with_suffix(".tmp")
+                try:
+                    DOSSIER_CACHE.mkdir(parents=True, exist_ok=True)
+                    self.df.to_parquet(chemin_temporaire, compression="zstd")
+                    os.replace(chemin_temporaire, chemin_cache)
+                    purger_cache()
+                except Exception:
+                    # Colonnes non sérialisables en Parquet (ex: types mixtes) : pas de cache
+                    chemin_temporaire.unlink(missing_ok=True)
+
+            # Le cache garde les types d'origine ; la réduction est appliquée après
+            if optimize_dtypes and isinstance(self.df, pd.DataFrame):
+                self.df = optimiser_types(self.df)
+
             # Si tout s'est bien passé
             print(f"\nFichier '{Path(file_path).name}' chargé avec succès.")
             return self.df
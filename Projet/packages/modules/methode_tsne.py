@@ -1,15 +1,63 @@
 #methode_tsne.py
-from typing import Union
+from typing import Optional, Union
 import pandas as pd
 import numpy as np
 from sklearn.manifold import TSNE
 
+# openTSNE (C++ multi-thread, gradient FFT) est utilisé s'il est installé
+try:
+    import openTSNE
+except ImportError:
+    openTSNE = None
+
 class MethodeTSNE:
     def __init__(self, df: Union[pd.DataFrame, np.ndarray, str]):
         self.df = df
+        # Lignes de self.df présentes dans le résultat après sous-échantillonnage (None = toutes)
+        self.indices_echantillon = None
+
+    def tsne_reduction(self, nombre_de_dimension = 1, perplexity=5, max_samples: Optional[int] = None) -> np.ndarray:
+        # Matrice float32 contiguë : deux fois moins de mémoire à parcourir qu'en float64
+        X = np.ascontiguousarray(
+            self.df.to_numpy(dtype=np.float32) if hasattr(self.df, "to_numpy") else np.asarray(self.df, dtype=np.float32)
+        )
+        self.indices_echantillon = None
+        X_apprentissage = X
+        if max_samples and len(X) > max_samples:
+            # Tirage aléatoire reproductible, indices triés pour garder l'ordre des lignes
+            indices = np.sort(np.random.default_rng(0).choice(len(X), max_samples, replace=False))
+            X_apprentissage = X[indices]
+
+        if openTSNE is not None:
+            tsne = openTSNE.TSNE(
+                n_components=nombre_de_dimension,
+                perplexity=perplexity,
+                negative_gradient_method="fft" if nombre_de_dimension <= 2 else "bh", # FFT limité à 2 dimensions
+                n_jobs=-1
+            )
+            embedding = tsne.fit(X_apprentissage)
+            if X_apprentissage is X:
+                return np.asarray(embedding)
+            # Lignes apprises : leur position optimisée ; les autres sont placées par openTSNE
+            # dans l'espace déjà construit
+            X_tsne = np.empty((len(X), nombre_de_dimension), dtype=np.float64)
+            X_tsne[indices] = np.asarray(embedding)
+            restantes = np.ones(len(X), dtype=bool)
+            restantes[indices] = False
+            X_tsne[restantes] = np.asarray(embedding.transform(X[restantes]))
+            return X_tsne
 
-    def tsne_reduction(self, nombre_de_dimension = 1, perplexity=5) -> np.ndarray:
-        tsne = TSNE(n_components=nombre_de_dimension, perplexity=perplexity)
-        X_tsne = tsne.fit_transform(self.df)
+        if X_apprentissage is not X:
+            # TSNE de scikit-learn n'a pas de transform : seul l'échantillon est projeté
+            self.indices_echantillon = indices
+        tsne = TSNE(
+            n_components=nombre_de_dimension,
+            perplexity=perplexity,
+            method="barnes_hut",
+            init="pca",
+            learning_rate="auto",
+            n_jobs=-1
+        )
+        X_tsne = tsne.fit_transform(X_apprentissage)
         return X_tsne
- #mes parametres : nombre_de_dimension, perplexity=5 par defaut       
\ No newline at end of file
+ #mes parametres : nombre_de_dimension, perplexity=5 par defaut
@@ -24,12 +24,12 @@ class Netoyage:
             print("L'opération n'est applicable qu'aux DataFrames.")
             return self.df
 
-        df_copy = self.df.copy() # On travaille sur une copie pour ne pas modifier l'original
-
         if strategy == 'drop':
-            df_copy.dropna(inplace=True)
+            # dropna() renvoie déjà un nouveau tableau : inutile de copier l'original avant
+            df_copy = self.df.dropna()
             print("Les lignes avec des valeurs manquantes ont été supprimées.")
         else:
+            df_copy = self.df.copy() # On travaille sur une copie pour ne pas modifier l'original
             columns_to_handle = [column] if column else df_copy.select_dtypes(include=np.number).columns
             if not columns_to_handle.empty:
                 for col in columns_to_handle:
@@ -64,7 +64,7 @@ class Netoyage:
             return self.df
 
         initial_rows = len(self.df)
-        df_copy = self.df.drop_duplicates().copy()
+        df_copy = self.df.drop_duplicates()
         dropped_rows = initial_rows - len(df_copy)
         print(f"{dropped_rows} lignes dupliquées ont été supprimées.")
         return df_copy
\ No newline at end of file
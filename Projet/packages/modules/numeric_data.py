@@ -1,6 +1,5 @@
 from typing import Union
 import pandas as pd
-from pandas.api.types import is_numeric_dtype # Vérifie si une déonnée est de type numérique (int, float etc)
 import numpy as np
 
 class Numeric_data:
@@ -8,6 +7,6 @@ class Numeric_data:
         self.df = df
     
     def num_col(self) -> Union[pd.DataFrame, np.ndarray, str]:
-        # Sélection des données de type numérique (int, float etc) dans un dictionnaire
-        data = {col: self.df[col] for col in self.df.columns if is_numeric_dtype(self.df[col])}
-        return pd.DataFrame(data=data)
\ No newline at end of file
+        # Sélection des données de type numérique (int, float, bool etc, comme `is_numeric_dtype`)
+        # en un seul appel, sans reconstruire un DataFrame colonne par colonne
+        return self.df.select_dtypes(include=['number', 'bool'])
\ No newline at end of file
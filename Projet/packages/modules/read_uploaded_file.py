@@ -1,30 +1,40 @@
 import pandas as pd
-import csv
-from io import StringIO
+import codecs
+from charset_normalizer import from_bytes
+
+from packages.modules.loading import MOTEUR_EXCEL, detecter_separateur, lire_csv_pyarrow
+
+# Encodages proposés à charset-normalizer quand le fichier n'est pas en UTF-8 ; sans cette
+# liste, un court texte français est souvent pris pour du cp1250 ou du johab (accents faux).
+ENCODAGES_CANDIDATS = ['utf_16', 'cp1252', 'latin_1', 'iso8859_15', 'cp850', 'mac_roman']
 
 def read_uploaded_file(file):
     """Lit un fichier CSV ou Excel uploadé via FastAPI et retourne un DataFrame."""
     try:
-        content = file.file.read()
-
         if file.filename.endswith('.csv'):
-            # Gestion des encodages
-            try:
-                decoded_content = content.decode('utf-8')
-            except UnicodeDecodeError:
-                decoded_content = content.decode('latin-1')
+            # Le fichier temporaire (SpooledTemporaryFile) est lu directement par pyarrow :
+            # ni copie complète en bytes, ni décodage Python de tout le contenu.
+            flux = file.file
+            flux.seek(0)
 
-            # Détection du séparateur
-            sample = decoded_content[:1000]
+            # Détection de l'encodage une seule fois, sur un échantillon de 16 Ko :
+            # UTF-8 (cas courant) vérifié directement, sinon charset-normalizer.
+            echantillon_brut = flux.read(16384)
+            flux.seek(0)
             try:
-                sep = csv.Sniffer().sniff(sample).delimiter
-            except Exception:
-                sep = ','
+                codecs.getincrementaldecoder('utf-8')().decode(echantillon_brut)
+                encoding = 'utf8'
+            except UnicodeDecodeError:
+                detection = from_bytes(echantillon_brut, cp_isolation=ENCODAGES_CANDIDATS).best()
+                encoding = detection.encoding if detection is not None else 'latin1'
+            sample = echantillon_brut.decode(encoding, errors='replace')
 
-            return pd.read_csv(StringIO(decoded_content), sep=sep)
+            # Détection du séparateur, puis lecture PyArrow (repli pandas pour un fichier irrégulier)
+            sep = detecter_separateur(sample)
+            return lire_csv_pyarrow(flux, sep, encodage=encoding)
 
         elif file.filename.endswith(('.xls', '.xlsx')):
-            return pd.read_excel(file.file)
+            return pd.read_excel(file.file, engine=MOTEUR_EXCEL)
 
         else:
             raise ValueError("Format de fichier non supporté (seulement CSV ou Excel).")
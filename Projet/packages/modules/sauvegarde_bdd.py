@@ -1,13 +1,92 @@
+import os
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from sqlalchemy import create_engine
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_float_dtype, is_integer_dtype
 from typing import Literal
 
+
+def type_sqlite(dtype) -> str:
+    """
+    Retourne le type de colonne SQLite correspondant à un dtype pandas.
+
+    Args:
+        dtype: Le dtype de la colonne pandas.
+
+    Returns:
+        str: 'INTEGER', 'REAL', 'TIMESTAMP' ou 'TEXT'.
+    """
+    if is_bool_dtype(dtype) or is_integer_dtype(dtype):
+        return "INTEGER"
+    if is_float_dtype(dtype):
+        return "REAL"
+    if is_datetime64_any_dtype(dtype):
+        return "TIMESTAMP"
+    return "TEXT"
+
+
+def identifiant_sql(nom) -> str:
+    """Met un nom de table ou de colonne entre guillemets SQL (guillemets internes doublés)."""
+    return '"' + str(nom).replace('"', '""') + '"'
+
+
+# Écriture parallèle : au-delà de LIGNES_MIN_PARALLELE lignes, le DataFrame est découpé en
+# partitions écrites simultanément dans des bases temporaires, puis fusionnées par ATTACH.
+# PARTITIONS_MAX reste sous la limite SQLite de 10 bases attachées.
+LIGNES_MIN_PARALLELE = 500_000
+PARTITIONS_MAX = 8
+
+
+def colonnes_sqlite(df: pd.DataFrame) -> list:
+    """
+    Convertit chaque colonne en tableau d'objets Python acceptés par sqlite3 (NaN/NaT -> NULL).
+    Les dates gardent leurs microsecondes, au même format que `df.to_sql`.
+    """
+    colonnes = []
+    for nom_colonne, serie in df.items():
+        if is_datetime64_any_dtype(serie.dtype):
+            serie = serie.dt.strftime("%Y-%m-%d %H:%M:%S.%f").where(serie.notna(), None)
+        else:
+            serie = serie.astype(object).where(serie.notna(), None)
+        colonnes.append(serie.to_numpy())
+    return colonnes
+
+
+def requete_insertion(table: str, noms_colonnes) -> str:
+    """
+    Construit l'INSERT nommant explicitement ses colonnes : en mode 'append', les valeurs vont
+    dans la bonne colonne même si la table existante les range dans un autre ordre ou en a davantage.
+    """
+    liste_colonnes = ", ".join(identifiant_sql(nom) for nom in noms_colonnes)
+    marqueurs = ", ".join("?" * len(noms_colonnes))
+    return f"INSERT INTO {table} ({liste_colonnes}) VALUES ({marqueurs})"
+
+
+def ecrire_partition(chemin_partition: str, table: str, definition: str, insertion: str, colonnes: list, debut: int, fin: int):
+    """Écrit les lignes [debut, fin) dans une base temporaire (une connexion par thread)."""
+    connexion = sqlite3.connect(chemin_partition)
+    try:
+        # Base jetable : ni journal ni fsync
+        connexion.execute("PRAGMA synchronous=OFF")
+        connexion.execute("PRAGMA journal_mode=OFF")
+        connexion.execute("BEGIN")
+        connexion.execute(f"CREATE TABLE {table} ({definition})")
+        connexion.executemany(
+            insertion,
+            zip(*(colonne[debut:fin] for colonne in colonnes))
+        )
+        connexion.commit()
+    finally:
+        connexion.close()
+
+
 class SauvegardeBDD:
     """
     Classe pour sauvegarder un DataFrame Pandas dans une base de données.
-    Utilise SQLAlchemy pour la connexion.
+    Écrit directement avec le module sqlite3 (SQLAlchemy reste disponible en option).
     """
-    
+
     def __init__(self, df: pd.DataFrame):
         """
         Initialise avec le DataFrame à sauvegarder.
@@ -20,44 +99,37 @@ class SauvegardeBDD:
         self.df = df
 
     def sauvegarder_en_sqlite(
-        self, 
-        chemin_bdd: str, 
-        nom_table: str, 
-        si_existe: Literal['fail', 'replace', 'append'] = 'fail'
+        self,
+        chemin_bdd: str,
+        nom_table: str,
+        si_existe: Literal['fail', 'replace', 'append'] = 'fail',
+        utiliser_sqlalchemy: bool = False
     ):
         """
         Sauvegarde le DataFrame dans une base de données SQLite.
 
         Args:
-            chemin_bdd (str): Le chemin vers le fichier de la base de données 
+            chemin_bdd (str): Le chemin vers le fichier de la base de données
                               (ex: "storage/ma_base.db").
             nom_table (str): Le nom de la table où enregistrer les données.
             si_existe (Literal): Comportement si la table existe déjà:
                 - 'fail': (Défaut) Lève une erreur.
                 - 'replace': Supprime l'ancienne table et la remplace.
                 - 'append': Ajoute les données à la table existante.
-        
+            utiliser_sqlalchemy (bool): Si True, écrit via SQLAlchemy + `df.to_sql`
+                                        (ancien chemin) au lieu de sqlite3.
+
         Returns:
             dict: Un message de succès.
         """
         try:
-            # Crée l'URL de connexion pour SQLite
-            # 'sqlite:///storage/ma_base.db'
-            url_connexion = f"sqlite:///{chemin_bdd}"
-            
-            # Crée le "moteur" de base de données
-            moteur = create_engine(url_connexion)
-            
             print(f"[INFO] Sauvegarde de {len(self.df)} lignes dans la table '{nom_table}' de '{chemin_bdd}'...")
 
-            # Utilise pandas pour écrire dans la base de données
-            self.df.to_sql(
-                nom_table, 
-                con=moteur, 
-                if_exists=si_existe,
-                index=False # Ne pas inclure l'index pandas comme colonne
-            )
-            
+            if utiliser_sqlalchemy:
+                self._ecrire_avec_sqlalchemy(chemin_bdd, nom_table, si_existe)
+            else:
+                self._ecrire_avec_sqlite3(chemin_bdd, nom_table, si_existe)
+
             message = f"Succès : {len(self.df)} lignes sauvegardées dans la table '{nom_table}'."
             print(f"[INFO] {message}")
             return {"status": "success", "message": message}
@@ -65,4 +137,105 @@ class SauvegardeBDD:
         except Exception as e:
             # Gérer les erreurs (ex: la table existe déjà et si_existe='fail')
             print(f"[ERREUR] Échec de la sauvegarde BDD : {e}")
-            raise e
\ No newline at end of file
+            raise e
+
+    def _ecrire_avec_sqlite3(self, chemin_bdd: str, nom_table: str, si_existe: str):
+        """
+        Écrit le DataFrame avec une connexion sqlite3 brute : un seul executemany, ou, pour un
+        gros DataFrame sur une machine multi-cœurs, des partitions écrites en parallèle puis
+        fusionnées en une seule transaction.
+        """
+        table = identifiant_sql(nom_table)
+        nb_partitions = min(os.cpu_count() or 1, PARTITIONS_MAX)
+        parallele = len(self.df) >= LIGNES_MIN_PARALLELE and nb_partitions > 1
+
+        connexion = sqlite3.connect(chemin_bdd)
+        try:
+            # Pas de fsync ni de journal sur disque pendant l'écriture en masse, cache de ~200 Mo
+            connexion.execute("PRAGMA synchronous=OFF")
+            connexion.execute("PRAGMA journal_mode=MEMORY")
+            connexion.execute("PRAGMA cache_size=-200000")
+
+            # Noms de tables insensibles à la casse pour SQLite : 't' et 'T' désignent la même table
+            existe = connexion.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=? COLLATE NOCASE", (str(nom_table),)
+            ).fetchone() is not None
+            if existe and si_existe == 'fail':
+                raise ValueError(f"Table '{nom_table}' already exists.")
+
+            colonnes = colonnes_sqlite(self.df)
+            insertion = requete_insertion(table, list(self.df.columns))
+            definition = ", ".join(
+                f"{identifiant_sql(nom)} {type_sqlite(dtype)}" for nom, dtype in self.df.dtypes.items()
+            )
+
+            if not parallele:
+                connexion.execute("BEGIN")
+                if existe and si_existe == 'replace':
+                    connexion.execute(f"DROP TABLE IF EXISTS {table}")
+                connexion.execute(f"CREATE TABLE IF NOT EXISTS {table} ({definition})")
+                connexion.executemany(insertion, zip(*colonnes))
+                connexion.commit()
+                return
+
+            # Bases temporaires à côté de la base cible (même système de fichiers)
+            with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(chemin_bdd))) as dossier:
+                nb_lignes = len(self.df)
+                bornes = [(i * nb_lignes // nb_partitions, (i + 1) * nb_lignes // nb_partitions) for i in range(nb_partitions)]
+                chemins = [os.path.join(dossier, f"partition_{i}.db") for i in range(nb_partitions)]
+
+                # sqlite3 relâche le GIL pendant l'exécution SQL : les partitions s'écrivent en parallèle
+                with ThreadPoolExecutor(max_workers=nb_partitions) as executeur:
+                    list(executeur.map(
+                        lambda i: ecrire_partition(chemins[i], table, definition, insertion, colonnes, *bornes[i]),
+                        range(nb_partitions)
+                    ))
+
+                # ATTACH est interdit dans une transaction : toutes les partitions sont attachées avant
+                for i, chemin in enumerate(chemins):
+                    connexion.execute("ATTACH DATABASE ? AS ?", (chemin, f"partition_{i}"))
+                try:
+                    connexion.execute("BEGIN")
+                    if existe and si_existe == 'replace':
+                        connexion.execute(f"DROP TABLE IF EXISTS main.{table}")
+                    connexion.execute(f"CREATE TABLE IF NOT EXISTS main.{table} ({definition})")
+                    # Colonnes nommées des deux côtés : la table cible (en 'append') peut les ranger autrement
+                    liste_colonnes = ", ".join(identifiant_sql(nom) for nom in self.df.columns)
+                    for i in range(nb_partitions):
+                        connexion.execute(
+                            f"INSERT INTO main.{table} ({liste_colonnes}) "
+                            f"SELECT {liste_colonnes} FROM partition_{i}.{table}"
+                        )
+                    connexion.commit()
+                finally:
+                    if connexion.in_transaction:
+                        connexion.rollback()
+                    for i in range(nb_partitions):
+                        connexion.execute(f"DETACH DATABASE partition_{i}")
+        except Exception:
+            if connexion.in_transaction:
+                connexion.rollback()
+            raise
+        finally:
+            connexion.close()
+
+    def _ecrire_avec_sqlalchemy(self, chemin_bdd: str, nom_table: str, si_existe: str):
+        """Écrit le DataFrame via SQLAlchemy et `df.to_sql` (une transaction, insertions par lots)."""
+        from sqlalchemy import create_engine
+
+        # Crée l'URL de connexion pour SQLite
+        # 'sqlite:///storage/ma_base.db'
+        moteur = create_engine(f"sqlite:///{chemin_bdd}")
+
+        # synchronous=OFF / journal_mode=MEMORY : pas de fsync ni de journal sur disque
+        # pendant l'écriture en masse.
+        with moteur.begin() as connexion:
+            connexion.exec_driver_sql("PRAGMA synchronous=OFF")
+            connexion.exec_driver_sql("PRAGMA journal_mode=MEMORY")
+            self.df.to_sql(
+                nom_table,
+                con=connexion,
+                if_exists=si_existe,
+                index=False, # Ne pas inclure l'index pandas comme colonne
+                chunksize=10_000 # Insertions par lots (executemany)
+            )
@@ -0,0 +1,43 @@
+"""
+Module : standardisation.py
+But : Centrer-réduire (z-score) une matrice numérique avant la réduction de dimension,
+avec une boucle compilée par Numba et parallélisée sur les colonnes.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def standardiser(X: np.ndarray) -> np.ndarray:
+    """
+    Retourne une copie centrée-réduite de `X`, colonne par colonne.
+
+    Même convention que `StandardScaler` : écart-type de population (ddof=0),
+    et une colonne constante est seulement centrée.
+
+    Args:
+        X (np.ndarray) : Matrice 2D (lignes = observations, colonnes = variables) sans NaN.
+
+    Return:
+        np.ndarray: Matrice de même forme et de même type que `X`.
+    """
+    n, p = X.shape
+    sortie = np.empty_like(X)
+    for j in prange(p):
+        moyenne = 0.0
+        for i in range(n):
+            moyenne += X[i, j]
+        moyenne /= n
+
+        variance = 0.0
+        for i in range(n):
+            ecart = X[i, j] - moyenne
+            variance += ecart * ecart
+        ecart_type = np.sqrt(variance / n)
+        if ecart_type == 0.0:
+            ecart_type = 1.0
+
+        for i in range(n):
+            sortie[i, j] = (X[i, j] - moyenne) / ecart_type
+    return sortie